@@ -1,9 +1,10 @@
 # Script to generate 3rd_party_licenses.md which attributes all third party components used by nvgt.
+# The generated markdown is streamed to disk section by section, and nothing is rendered or rewritten if the license texts have not changed since the last run. Outputs are only replaced when their bytes differ, so that docgen and SCons do not see spurious modifications. A machine readable index of all licenses (3rd_party_licenses.json) is also produced and copied next to the html in release/lib for use by the build and installer.
 # NVGT - NonVisual Gaming Toolkit (https://nvgt.gg)
 # Copyright (c) 2022-2024 Sam Tupy
 # license: zlib
 
-import glob, mistune, os, shutil
+import filecmp, glob, hashlib, json, mistune, os, shutil
 
 license_types = {
 	"zlib": "ZLib licensed code",
@@ -16,37 +17,87 @@ license_types = {
 }
 
 output_filename = "3rd_party_licenses"
+index_version = 1 # Bump this whenever the structure of any output changes so that cached outputs are regenerated. Edits to the text templates below and mistune upgrades are detected automatically.
 html_base = "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{title}</title>\n</head>\n<body>\n{body}\n</body>\n</html>\n"
 header = "# Third party code attributions\nThis application may use any amount of the following copywrited code or components, though it may not use all of them or may use some of them minimally.\n\nThis document may not serve as a complete reference of all copywrited material used in this application, and thus it's distribution should be checked for other similar documents to collect a complete list of copywrited content used in this software.\n\n"
+summary_header = "## Summary of components\nThe following is a convenient listing of third party material that this application may use, the full text for each license can be found below the lists.\n\n"
+
+def collect_licenses():
+	"""Reads every license text and returns a list of license entries along with a hash of all inputs."""
+	h = hashlib.sha256(f"{index_version}\n".encode())
+	# The templates and renderer that produce the outputs are part of the cache key so that changing any of them invalidates the cache just like editing a license text does.
+	for t in (header, summary_header, html_base, json.dumps(license_types), mistune.__version__): h.update(f"{len(t)}\n{t}".encode())
+	licenses = []
+	for ltype in license_types:
+		for fn in sorted(glob.glob(os.path.join(ltype, "*.txt")), key = str.casefold):
+			with open(fn, "rb") as f: data = f.read()
+			fn = fn.replace(os.sep, "/")
+			h.update(f"{fn}\n{len(data)}\n".encode())
+			h.update(data)
+			ltext = data.decode("UTF8").replace("\r\n", "\n").partition("\n")
+			licenses.append({"id": f"{ltype}_{os.path.split(fn)[1][:-4]}", "type": ltype, "name": ltext[0], "file": fn, "text": ltext[2]})
+	return licenses, h.hexdigest()
+
+def generate_markdown(licenses):
+	"""Yields the attributions document in markdown one section at a time."""
+	yield header
+	yield summary_header
+	for ltype in license_types:
+		yield f"### {license_types[ltype]}\n"
+		for l in licenses:
+			if l["type"] == ltype: yield f"* [{l['name']}](#{l['id']})\n"
+		yield "\n"
+	for ltype in license_types:
+		yield f"## {license_types[ltype]}\n\n"
+		for l in licenses:
+			if l["type"] == ltype: yield f"### <a id=\"{l['id']}\">{l['name']}</a>\n" + l["text"].replace("\n##", "\n###") + "\n"
+
+def write_if_changed(path, chunks):
+	"""Streams the given string chunks to a temporary file, then replaces path with it only if the contents differ. Returns True if path was modified."""
+	tmp = path + ".tmp"
+	with open(tmp, "w", encoding = "UTF8", newline = "\n") as f:
+		for c in chunks: f.write(c)
+	if os.path.isfile(path) and filecmp.cmp(tmp, path, shallow = False):
+		os.remove(tmp)
+		return False
+	os.replace(tmp, path)
+	return True
+
+def copy_if_changed(src, dst):
+	"""Copies src to dst only if dst does not exist or has different contents. Returns True if dst was modified."""
+	if os.path.isfile(dst) and filecmp.cmp(src, dst, shallow = False): return False
+	shutil.copyfile(src, dst)
+	return True
+
+def load_index():
+	"""Returns the previously written license index or None if it doesn't exist or can't be parsed."""
+	try:
+		with open(f"{output_filename}.json", "r", encoding = "UTF8") as f: return json.load(f)
+	except (OSError, ValueError): return None
 
 def main():
-	summary = "## Summary of components\nThe following is a convenient listing of third party material that this application may use, the full text for each license can be found below the lists.\n\n"
-	body = ""
-	f = open(f"{output_filename}.md", "w", encoding="UTF8")
-	f.write(header)
-	for ltype in list(license_types):
-		lname = license_types[ltype]
-		summary += f"### {lname}\n"
-		body += f"## {lname}\n\n"
-		for fn in glob.glob(os.path.join(ltype, "*.txt")):
-			f2 = open(fn, "r", encoding="UTF8")
-			ltext = f2.read().partition("\n")
-			f2.close()
-			summary += f"* [{ltext[0]}](#{ltype}_{os.path.split(fn)[1][:-4]})\n"
-			body += f"### <a id=\"{ltype}_{os.path.split(fn)[1][:-4]}\">{ltext[0]}</a>\n" + ltext[2].replace('\n##', '\n###') + "\n"
-		summary += "\n"
-	f.write(summary)
-	f.write(body)
-	f.close()
-	f = open(f"{output_filename}.html", "w")
-	f.write(html_base.format(title = "third party code attributions", body = mistune.html(header + summary + body)))
-	f.close()
+	licenses, input_hash = collect_licenses()
+	index = load_index()
+	outputs = [f"{output_filename}.{ext}" for ext in ("md", "html", "json")]
+	if index and index.get("input_hash") == input_hash and all(os.path.isfile(o) for o in outputs):
+		print("License texts, templates and renderer unchanged, skipping generation.")
+	else:
+		write_if_changed(f"{output_filename}.md", generate_markdown(licenses))
+		write_if_changed(f"{output_filename}.html", [html_base.format(title = "third party code attributions", body = mistune.html("".join(generate_markdown(licenses))))])
+		index = {
+			"version": index_version,
+			"input_hash": input_hash,
+			"types": license_types,
+			"licenses": [{k: v for k, v in l.items() if k != "text"} | {"sha256": hashlib.sha256(l["text"].encode("UTF8")).hexdigest()} for l in licenses],
+		}
+		write_if_changed(f"{output_filename}.json", [json.dumps(index, indent = "\t"), "\n"])
+		print(f"Generated attributions for {len(licenses)} components.")
 	try:
-		shutil.copyfile(f"{output_filename}.md", os.path.join("..", "src", "appendix", "Third Party Code Attributions@.md"))
+		copy_if_changed(f"{output_filename}.md", os.path.join("..", "src", "appendix", "Third Party Code Attributions@.md"))
 		if os.path.isdir(os.path.join("..", "..", "release")):
 			if not os.path.isdir(os.path.join("..", "..", "release", "lib")): os.mkdir(os.path.join("..", "..", "release", "lib"))
-			shutil.copyfile(f"{output_filename}.html", os.path.join("..", "..", "release", "lib", f"{output_filename}.html"))
-	except: pass
+			for ext in ("html", "json"): copy_if_changed(f"{output_filename}.{ext}", os.path.join("..", "..", "release", "lib", f"{output_filename}.{ext}"))
+	except OSError: pass
 
 if __name__ == "__main__":
 	main()
@@ -0,0 +1,68 @@
+# Benchmarks the API symbol index (nvgt_symbols.idx) against re-parsing the doc/src tree, which is what tooling had to do to look up a signature before the index existed.
+# Run from the doc directory: python bench_symbols.py [iterations]
+# NVGT - NonVisual Gaming Toolkit (https://nvgt.gg)
+# Copyright (c) 2022-2025 Sam Tupy
+# license: zlib
+
+import docgen
+import nvgt_symbols
+import os
+import random
+import sys
+import tempfile
+import time
+
+def reparse_symbols():
+	"""Scans and parses doc/src the way docgen does, returning the list of symbols found without writing any output."""
+	tree = docgen.make_topic_map()
+	symbols = []
+	for path in tree:
+		if not path.startswith(os.path.join("src", "references", "")): continue
+		if "path" in tree[path]:
+			with open(path, "r", encoding = "UTF8") as f: data = f.read()
+			if path.endswith(".nvgt"): docgen.parse_nvgt_markdown(tree, path, data)
+			symbol = docgen.make_topic_symbol(tree, path, data)
+		else: symbol = docgen.make_directory_symbol(tree, path)
+		if symbol: symbols.append(symbol)
+	return symbols
+
+def timed(func, *args):
+	start = time.perf_counter()
+	result = func(*args)
+	return result, time.perf_counter() - start
+
+def report(label, seconds):
+	print(f"{label}: {seconds * 1000000:.1f}us")
+
+def main():
+	iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+	parse_times = []
+	for i in range(3):
+		symbols, t = timed(reparse_symbols)
+		parse_times.append(t)
+	names = [s["name"] for s in symbols]
+	prefixes = list(set(n[:3] for n in names))
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "nvgt_symbols.idx")
+		count = nvgt_symbols.write_index(path, symbols)
+		print(f"{count} symbols, index is {os.path.getsize(path)} bytes")
+		report("re-parse doc/src (best of 3)", min(parse_times))
+		load_times = []
+		for i in range(100):
+			index, t = timed(nvgt_symbols.symbol_index, path)
+			index.close()
+			load_times.append(t)
+		report("index load (best of 100)", min(load_times))
+		rng = random.Random(0)
+		with nvgt_symbols.symbol_index(path) as index:
+			for label, func, keys in (("get", index.get, names), ("prefix (3 characters)", index.prefix, prefixes)):
+				latencies = []
+				for i in range(iterations):
+					latencies.append(timed(func, rng.choice(keys))[1])
+				latencies.sort()
+				report(f"{label} p50", latencies[len(latencies) // 2])
+				report(f"{label} p99", latencies[len(latencies) * 99 // 100])
+
+if __name__ == "__main__":
+	os.chdir(os.path.dirname(os.path.abspath(__file__)))
+	main()
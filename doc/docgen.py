@@ -5,6 +5,7 @@
 
 import json
 import mistune
+import nvgt_symbols
 import os
 import shutil
 import sys
@@ -72,7 +73,7 @@ def list_topics_via_walk(tree, root, dirs, files):
 
 def make_topic_map():
 	"""Scans the doc/src directory for topics according to the rules in doc/src/advanced/docgen+.md."""
-	tree = {"src": {"name": "NVGT Documentation", "topics": [], "markdown": None}}
+	tree = {"src": {"name": "NVGT Documentation", "topics": [], "markdown": None, "symbols": []}}
 	for root, dirs, files in os.walk("src"):
 		if os.path.isfile(os.path.join(root, ".index.json")): list_topics_via_index(tree, root)
 		else: list_topics_via_walk(tree, root, dirs, files)
@@ -87,30 +88,47 @@ def make_chm_filename(path):
 	"""Derive a temporary html filename from a topic path for the creation of a .chm file. Path is expected to be valid."""
 	return make_slug(os.path.splitext(path)[0][4:]) + ".htm"
 
-def create_markdown_document(path):
-	"""Given a path to a markdown root, creates the markdown document and returns the file object used to create the document for writing. The markdown directory is expected to exist by the time this is called, path is expected to be valid, and this function shouldn't be called more than once per path."""
+def make_markdown_filename(path):
+	"""Given a path to a markdown root, returns the filename of the markdown document that will be created for it. Path is expected to be valid."""
 	filename = ""
 	if filename.lower().endswith("@.md"): filename = filename[:-4]
 	if path == "src": # edgecase (rootmost document)
 		filename = os.path.join("md", "nvgt.md")
 	else: filename = os.path.join("md", make_slug("nvgt_" + path[4:]) + ".md")
-	return open(filename, "w", encoding = "utf8")
+	return filename
 
-def get_markdown_document(tree, path):
-	"""Returns a tuple containing a file object in which markdown should be written to for a topic as well as an integer containing a heading level that this topic should be printed as within the given markdown document."""
-	if not tree or not path: return (None, 0) # We check this to avoid a potential infinent loop.
-	root = ""
+def make_html_filename(md_path):
+	"""Given a path to a markdown document, returns the filename of the html document that will be created from it."""
+	md_path = os.path.split(md_path)[1]
+	if md_path == "nvgt.md": md_path = "index.html"
+	elif md_path.startswith("nvgt_"): md_path = md_path[5:]
+	if md_path.endswith(".md"): md_path = md_path[:-3] + ".html"
+	return md_path.lower()
+
+def create_markdown_document(path):
+	"""Given a path to a markdown root, creates the markdown document and returns the file object used to create the document for writing. The markdown directory is expected to exist by the time this is called, path is expected to be valid, and this function shouldn't be called more than once per path."""
+	return open(make_markdown_filename(path), "w", encoding = "utf8")
+
+def find_markdown_root(tree, path):
+	"""Returns a tuple containing the path of the markdown root that a topic belongs to as well as an integer containing a heading level that this topic should be printed as within that root's markdown document."""
+	if not tree or not path: return ("", 0) # We check this to avoid a potential infinent loop.
 	temp_path = path # We'll slowly break this down until we find the root document.
 	depth = temp_path.count(os.path.sep) # Todo: Perhaps convert to pathlib?
-	while not root:
-		if not temp_path in tree: return (None, 0) # if this edgecase is reached something has gone terribly wrong.
+	while temp_path:
+		if not temp_path in tree: return ("", 0) # if this edgecase is reached something has gone terribly wrong.
 		if "markdown" in tree[temp_path]: # Root found!
-			if not tree[temp_path]["markdown"]: # This markdown file hasn't been created, do that now.
-				tree[temp_path]["markdown"] = create_markdown_document(temp_path)
 			if temp_path != "src": depth -= temp_path.count(os.path.sep) -1
-			return (tree[temp_path]["markdown"], depth)
+			return (temp_path, depth)
 		temp_path = os.path.split(temp_path)[0]
-	return (None, 0)
+	return ("", 0)
+
+def get_markdown_document(tree, path):
+	"""Returns a tuple containing a file object in which markdown should be written to for a topic as well as an integer containing a heading level that this topic should be printed as within the given markdown document."""
+	root, depth = find_markdown_root(tree, path)
+	if not root: return (None, 0)
+	if not tree[root]["markdown"]: # This markdown file hasn't been created, do that now.
+		tree[root]["markdown"] = create_markdown_document(root)
+	return (tree[root]["markdown"], depth)
 
 def parse_nvgt_markdown(tree, path, data):
 	"""Parses a .nvgt file within the doc/src directory to derive markdown from it according to the rules in doc/src/advanced/docgen+.md. The file's data is expected to be provided."""
@@ -148,6 +166,70 @@ def parse_nvgt_markdown(tree, path, data):
 	if started_codeblock and not in_markdown: markdown += "```\n\n" # end code block.
 	return markdown
 
+symbol_member_kinds = {"methods": "method", "operators": "operator", "properties": "property"}
+
+def is_class_directory(tree, path):
+	"""Returns True if the given directory in the topic tree documents a class, meaning that it either contains methods, properties or operators subsections or that it lives within a classes subsection."""
+	if not "topics" in tree.get(path, {}): return False
+	if os.path.split(os.path.split(path)[0])[1].lower() == "classes": return True
+	return any(os.path.split(t)[1].lower() in symbol_member_kinds and "topics" in tree[t] for t in tree[path]["topics"])
+
+def find_class_intro(tree, path):
+	"""Returns the path of the topic that introduces the class documented by the given directory, that is the topic directly within it that has the same name as the class, or an empty string if there isn't one."""
+	name = tree[path]["name"].casefold().replace(" ", "_")
+	for t in tree[path]["topics"]:
+		if "path" in tree[t] and tree[t]["name"].casefold().replace(" ", "_") == name: return t
+	return ""
+
+def parse_symbol_text(path, data):
+	"""Returns a tuple containing the summary and a list of signatures of an API reference topic. In .nvgt files this looks at the leading docgen comment, and in .md files at the text after the topic's heading. The first line is the summary, and following lines up until the first heading that look like code are the signatures."""
+	if path.endswith(".nvgt"):
+		if not data.startswith("/**"): return ("", [])
+		lines = data.partition("*/")[0].split("\n")[1:]
+	else: lines = [l for l in data.split("\n") if not l.startswith("# ")]
+	lines = [l.strip() for l in lines]
+	lines = [l for l in lines if l]
+	if not lines: return ("", [])
+	signatures = []
+	for l in lines[1:]:
+		if l.startswith("#"): break
+		if l.partition(". ")[0].isdigit(): l = l.partition(". ")[2].strip() # Numbered overloads.
+		l = l.strip("`")
+		if l.startswith("*") or not ("(" in l or l.endswith(";")): continue
+		if path.endswith(".md") and not (l.endswith(";") or l.endswith(")")): continue # Markdown topics are prose, so be stricter about what looks like code.
+		signatures.append(l.replace("\\<", "<").replace("\\>", ">"))
+	return (lines[0], signatures)
+
+def make_symbol(tree, path, name, kind, summary = "", signatures = None):
+	"""Returns an entry for the API symbol index. Anchors are document level, that is they name the markdown, html and chm documents a symbol appears in."""
+	root = find_markdown_root(tree, path)[0]
+	md = make_markdown_filename(root) if root else ""
+	return {"name": name, "kind": kind, "signatures": list(signatures) if signatures else [], "summary": summary, "topic": path.replace(os.path.sep, "/"), "md": os.path.split(md)[1], "html": make_html_filename(md) if md else "", "chm": make_chm_filename(path) if "path" in tree[path] else ""}
+
+def make_topic_symbol(tree, path, data):
+	"""Derives an entry for the API symbol index from a topic within the doc/src/references directory, or returns None if the topic doesn't describe a function, class, method, operator or property. The topic's data is expected to be provided."""
+	name = tree[path]["name"]
+	parent = os.path.split(path)[0]
+	category = os.path.split(parent)[1].lower()
+	if path.endswith(".md") and os.path.split(path)[1].startswith("!") and find_class_intro(tree, parent) != path: return None # Introduces a section rather than documenting a symbol.
+	if category in symbol_member_kinds:
+		kind = symbol_member_kinds[category]
+		name = tree[os.path.split(parent)[0]]["name"] + "." + name
+	elif category == "global properties": kind = "property"
+	elif category == "enums" and path.endswith(".nvgt"): kind = "enum"
+	elif is_class_directory(tree, parent) and find_class_intro(tree, parent) == path:
+		kind = "class"
+		name = tree[parent]["name"]
+	elif category == "classes": kind = "class"
+	elif category == "functions" or path.endswith(".nvgt"): kind = "function"
+	else: return None # Markdown topics are usually prose rather than API reference.
+	return make_symbol(tree, path, name, kind, *parse_symbol_text(path, data))
+
+def make_directory_symbol(tree, path):
+	"""Returns an entry for the API symbol index if the given directory documents a class that has no introductory topic, otherwise None."""
+	if not path.startswith(os.path.join("src", "references", "")) or not is_class_directory(tree, path) or find_class_intro(tree, path): return None
+	return make_symbol(tree, path, tree[path]["name"], "class")
+
 def process_topic(tree, path, indent):
 	"""Processes a topic. Returns the plain text version of a topic given it's path, including indenting it's text, this is used in the output_documentation_section function below. Prior to returning the plaintext, outputs the chm source and markdown formats for this topic. Tree is required for cached topic names."""
 	if not os.path.isfile(path): return
@@ -162,6 +244,9 @@ def process_topic(tree, path, indent):
 	markdown = "\n"
 	if path.endswith(".nvgt"): markdown += parse_nvgt_markdown(tree, path, data)
 	else: markdown += data
+	if path.startswith(os.path.join("src", "references", "")):
+		symbol = make_topic_symbol(tree, path, data)
+		if symbol: tree["src"]["symbols"].append(symbol)
 	# Print the html which will be used for the .chm file.
 	chm = make_chm_filename(path)
 	if chm:
@@ -204,6 +289,8 @@ def process_topic(tree, path, indent):
 def output_documentation_section(tree, path, txt_output_file, hhc_output_file, hhk_output_file, indent = 0):
 	"""Recursively output a section of documentation to the file objects given."""
 	md_output_file, heading_indent = get_markdown_document(tree, path)
+	symbol = make_directory_symbol(tree, path)
+	if symbol: tree["src"]["symbols"].append(symbol)
 	if path != "src" and "topics" in tree[path]:
 		md_output_file.write(("#" * heading_indent) + " " + tree[path]["name"] + "\n")
 		tree[path]["category_heading"] = True # edgecase: Sometimes the first topic in a category will begin with a heading with the same name of the category, thus creating a double heading that we don't want. Mark the fact that a category was hidden so that the first processed topic in the category can avoid printing such a double heading.
@@ -251,12 +338,8 @@ def output_html_section(md_path, title):
 	f.close()
 	# Todo: A bit hacky and not cross project compatible here, sorry.
 	md = md.replace("](nvgt_", "](").replace(".md)", ".html)")
-	md_path = os.path.split(md_path)[1]
-	if md_path == "nvgt.md": md_path = "index.html"
-	elif md_path.startswith("nvgt_"): md_path = md_path[5:]
-	if md_path.endswith(".md"): md_path = md_path[:-3] + ".html"
+	md_path = make_html_filename(md_path)
 	html_body = mistune.html(md)
-	md_path = md_path.lower()
 	with open(os.path.join("html", md_path), "w", encoding = "utf8") as f:
 		f.write(html_base.format(title = title, body = html_body))
 	# The NVGT website is built using cobalt (a tiny static site generator that uses liquid templates), and an html version of the docs are hosted on that website. We want this version of the docs to use the liquid layout that the static site uses, so we simply create very basic .liquid files in the nvgt repo's web directory, if that exists.
@@ -286,6 +369,7 @@ def main():
 	hhc_output.write("</body>\n</html>\n") # </ul> in this case is written by output_documentation_section.
 	hhk_output.write("</ul>\n</body>\n</html>\n")
 	txt_output.close()
+	nvgt_symbols.write_index("nvgt_symbols.idx", tree["src"]["symbols"])
 	# Close the still open handles to markdown documents and output their html.
 	for t in tree:
 		if not "markdown" in tree[t]: continue
@@ -311,6 +395,7 @@ def main():
 			shutil.make_archive(os.path.join("..", "web", "src", "docs", "nvgt-html"), "zip", "html")
 			shutil.make_archive(os.path.join("..", "web", "src", "docs", "nvgt-markdown"), "zip", "md")
 			shutil.copy("nvgt.txt", os.path.join("..", "web", "src", "docs"))
+			shutil.copy("nvgt_symbols.idx", os.path.join("..", "web", "src", "docs"))
 
 if __name__ == "__main__":
 	main()
@@ -0,0 +1,120 @@
+# Reader and writer for nvgt_symbols.idx, the compact API symbol index emitted by docgen.py.
+# The index maps each documented function, class, method and property name to its signatures, summary, topic path and output documents, so that editor tooling and script linters can look up the API reference without re-parsing doc/src.
+# NVGT - NonVisual Gaming Toolkit (https://nvgt.gg)
+# Copyright (c) 2022-2025 Sam Tupy
+# license: zlib
+
+# File format (all integers little endian):
+# header: 8 byte magic, uint32 format version, uint32 record count.
+# offsets: uint32 file offset of each record, ordered by the utf8 bytes of the record's key.
+# records: uint16 key length, key, uint32 payload length, payload (compact utf8 json object).
+# Keys are sorted so that exact and prefix lookups are binary searches over the memory-mapped file, and only the payloads that are actually requested are ever decoded.
+
+import json
+import mmap
+import os
+import struct
+
+magic = b"NVGTSYM\0"
+format_version = 1
+header_struct = struct.Struct("<8sII")
+u16 = struct.Struct("<H")
+u32 = struct.Struct("<I")
+
+def write_index(path, symbols):
+	"""Writes a symbol index to path. Symbols is an iterable of dictionaries which must each contain a "name" key, all other keys are stored as the symbol's payload. Duplicate names are allowed and are all returned on lookup."""
+	records = []
+	for s in symbols:
+		key = s["name"].encode("UTF8")
+		payload = json.dumps({k: v for k, v in s.items() if k != "name"}, separators = (",", ":"), ensure_ascii = False).encode("UTF8")
+		records.append((key, payload))
+	records.sort()
+	offset = header_struct.size + u32.size * len(records)
+	offsets = []
+	for key, payload in records:
+		offsets.append(offset)
+		offset += u16.size + len(key) + u32.size + len(payload)
+	tmp = path + ".tmp"
+	with open(tmp, "wb") as f:
+		f.write(header_struct.pack(magic, format_version, len(records)))
+		f.write(b"".join(u32.pack(o) for o in offsets))
+		for key, payload in records:
+			f.write(u16.pack(len(key)) + key + u32.pack(len(payload)) + payload)
+	os.replace(tmp, path)
+	return len(records)
+
+class symbol_index:
+	"""Lazily loaded, memory-mapped view of a symbol index written by write_index. Nothing beyond the header is read until a lookup touches it."""
+	def __init__(self, path):
+		self._file = open(path, "rb")
+		try:
+			self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+		except ValueError: # Empty file.
+			self._file.close()
+			raise ValueError(f"{path} is not an nvgt symbol index")
+		if len(self._map) < header_struct.size:
+			self.close()
+			raise ValueError(f"{path} is not an nvgt symbol index")
+		file_magic, version, self._count = header_struct.unpack_from(self._map, 0)
+		if file_magic != magic or version != format_version:
+			self.close()
+			raise ValueError(f"{path} is not a version {format_version} nvgt symbol index")
+	def __len__(self):
+		return self._count
+	def __enter__(self):
+		return self
+	def __exit__(self, *args):
+		self.close()
+	def close(self):
+		if getattr(self, "_map", None) is not None:
+			self._map.close()
+			self._map = None
+		self._file.close()
+	def _offset(self, i):
+		return u32.unpack_from(self._map, header_struct.size + i * u32.size)[0]
+	def _key(self, i):
+		o = self._offset(i)
+		length = u16.unpack_from(self._map, o)[0]
+		return self._map[o + u16.size:o + u16.size + length]
+	def _symbol(self, i):
+		o = self._offset(i)
+		key_length = u16.unpack_from(self._map, o)[0]
+		o += u16.size
+		name = self._map[o:o + key_length].decode("UTF8")
+		o += key_length
+		length = u32.unpack_from(self._map, o)[0]
+		o += u32.size
+		symbol = json.loads(self._map[o:o + length])
+		symbol["name"] = name
+		return symbol
+	def _lower_bound(self, key):
+		"""Returns the index of the first record whose key is not less than the given key in bytes."""
+		lo, hi = 0, self._count
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if self._key(mid) < key: lo = mid + 1
+			else: hi = mid
+		return lo
+	def get(self, name):
+		"""Returns a list of all symbols with exactly the given name, usually containing 0 or 1 elements."""
+		key = name.encode("UTF8")
+		result = []
+		i = self._lower_bound(key)
+		while i < self._count and self._key(i) == key:
+			result.append(self._symbol(i))
+			i += 1
+		return result
+	def _prefix_indices(self, prefix, limit = 0):
+		"""Yields the indices of records whose keys begin with prefix in sorted order, stopping after limit records unless it is 0."""
+		key = prefix.encode("UTF8")
+		i = self._lower_bound(key)
+		end = self._count if not limit else min(self._count, i + limit)
+		while i < end and self._key(i).startswith(key):
+			yield i
+			i += 1
+	def names(self, prefix = "", limit = 0):
+		"""Returns the names of symbols starting with prefix in sorted order without decoding their payloads. A limit of 0 means no limit."""
+		return [self._key(i).decode("UTF8") for i in self._prefix_indices(prefix, limit)]
+	def prefix(self, prefix, limit = 0):
+		"""Returns a list of all symbols whose names begin with prefix in sorted order, for example "http." returns every documented member of the http class. A limit of 0 means no limit."""
+		return [self._symbol(i) for i in self._prefix_indices(prefix, limit)]
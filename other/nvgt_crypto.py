@@ -30,16 +30,22 @@ def derive_key_and_iv(password):
     iv = bytes([key_hash[i * 2] ^ (4 * i + 1) for i in range(16)])
     return key_hash, iv
 
-def aes_encrypt(plaintext, password):
-    """Encrypt a plaintext string using AES-CBC"""
+def aes_encrypt_bytes(data, password):
+    """Encrypt raw bytes using AES-CBC"""
     key, iv = derive_key_and_iv(password)
     cipher = AES.new(key, AES.MODE_CBC, iv)
-    padded_data = pad(plaintext.encode())
-    return cipher.encrypt(padded_data)
+    return cipher.encrypt(pad(data))
 
-def aes_decrypt(ciphertext, password):
-    """Decrypt an AES-CBC encrypted string"""
+def aes_decrypt_bytes(ciphertext, password):
+    """Decrypt AES-CBC encrypted bytes, returning b"" if the padding is invalid"""
     key, iv = derive_key_and_iv(password)
     cipher = AES.new(key, AES.MODE_CBC, iv)
-    decrypted_padded = cipher.decrypt(ciphertext)
-    return unpad(decrypted_padded).decode(errors="ignore")
+    return unpad(cipher.decrypt(ciphertext))
+
+def aes_encrypt(plaintext, password):
+    """Encrypt a plaintext string using AES-CBC"""
+    return aes_encrypt_bytes(plaintext.encode(), password)
+
+def aes_decrypt(ciphertext, password):
+    """Decrypt an AES-CBC encrypted string"""
+    return aes_decrypt_bytes(ciphertext, password).decode(errors="ignore")
@@ -0,0 +1,339 @@
+# An asyncio based local service that performs NVGT compatible encryption and decryption (see nvgt_crypto.py) on behalf of other processes.
+# A Python backend that exchanges encrypted payloads with NVGT game clients can keep one or more connections open to this service and pipeline requests over them, rather than paying per-call overhead or blocking its own event loop on AES work.
+# Usage:
+#   python nvgt_crypto_service.py serve [--host 127.0.0.1] [--port 8765] [--unix path] [--workers n] [--max-pending n]
+#   python nvgt_crypto_service.py bench [--host/--port/--unix of a running service] [--requests n] [--connections n] [--depth n] [--size n]
+# If bench is not given the address of a running service, it starts one in-process on a temporary address so that it can be run without any external setup.
+# Protocol: every message is a fixed header followed by a body, all integers little endian. Responses can arrive in a different order than requests were sent, and are matched up by request id.
+#   request: uint32 id, uint8 op, uint16 password length, uint32 data length, password (utf8), data.
+#   response: uint32 id, uint8 status, uint32 data length, data.
+#   ops: 1 = encrypt data, 2 = decrypt data, 3 = return the service's counters as a json object (password and data are ignored).
+#   status: 0 = success, 1 = error (data contains a utf8 error message).
+# Written for
+# NVGT - NonVisual Gaming Toolkit (https://nvgt.gg)
+# Copyright (c) 2022-2025 Sam Tupy
+# license: zlib
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import struct
+import tempfile
+import time
+
+from nvgt_crypto import aes_decrypt_bytes, aes_encrypt_bytes
+
+OP_ENCRYPT = 1
+OP_DECRYPT = 2
+OP_STATS = 3
+STATUS_OK = 0
+STATUS_ERROR = 1
+request_header = struct.Struct("<IBHI")
+response_header = struct.Struct("<IBI")
+max_data_length = 64 * 1024 * 1024
+
+def percentile(sorted_values, p):
+    """Return the p-th percentile (0-100) of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+class service_stats:
+    """Latency and throughput counters for a running service"""
+    def __init__(self, latency_samples=10000):
+        self.started = time.perf_counter()
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latencies = collections.deque(maxlen=latency_samples)  # Seconds, most recent requests only.
+
+    def record(self, latency, bytes_in, bytes_out, error):
+        self.requests += 1
+        self.errors += error
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.latencies.append(latency)
+
+    def snapshot(self):
+        """Return the counters as a dictionary suitable for json"""
+        uptime = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "uptime": uptime,
+            "connections": self.connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "requests_per_second": self.requests / uptime if uptime else 0.0,
+            "latency_p50_ms": percentile(latencies, 50) * 1000,
+            "latency_p99_ms": percentile(latencies, 99) * 1000,
+        }
+
+class crypto_service:
+    """Serves encrypt and decrypt requests, running AES in a bounded worker pool"""
+    def __init__(self, workers=None, max_pending=256):
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_pending = max_pending  # Per connection. Once reached, the connection is not read from until a request completes, pushing back on the client.
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="nvgt_crypto")
+        self.stats = service_stats()
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.pool.shutdown(wait=True)
+
+    def run_request(self, op, password, data):
+        """Executed in the worker pool"""
+        if op == OP_ENCRYPT:
+            return aes_encrypt_bytes(data, password)
+        if op == OP_DECRYPT:
+            return aes_decrypt_bytes(data, password)
+        raise ValueError(f"unknown op {op}")
+
+    async def handle_request(self, writer, write_lock, pending, request_id, op, password, data, received):
+        """Runs one request and writes its response"""
+        status = STATUS_OK
+        try:
+            if op == OP_STATS:
+                result = json.dumps(self.stats.snapshot()).encode()
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(self.pool, self.run_request, op, password, data)
+        except Exception as e:
+            status = STATUS_ERROR
+            result = str(e).encode()
+        self.stats.record(time.perf_counter() - received, len(data), len(result), status != STATUS_OK)
+        try:
+            async with write_lock:
+                writer.write(response_header.pack(request_id, status, len(result)) + result)
+                await writer.drain()
+        except ConnectionError:
+            pass  # The client is gone and handle_connection is tearing the connection down.
+
+    async def handle_connection(self, reader, writer):
+        self.stats.connections += 1
+        pending = asyncio.Semaphore(self.max_pending)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        def request_done(task):
+            # Runs once the response has been drained, so a client that stops reading responses also stops having its requests read. Done callbacks also run for tasks that were cancelled before they started, keeping the counters accurate.
+            tasks.discard(task)
+            self.stats.in_flight -= 1
+            pending.release()
+
+        try:
+            while True:
+                await pending.acquire()
+                try:
+                    header = await reader.readexactly(request_header.size)
+                except asyncio.IncompleteReadError:
+                    break
+                request_id, op, password_length, data_length = request_header.unpack(header)
+                if data_length > max_data_length:
+                    break  # The stream can't be resynchronized, so drop the connection.
+                password = (await reader.readexactly(password_length)).decode(errors="replace")
+                data = await reader.readexactly(data_length)
+                self.stats.in_flight += 1
+                task = asyncio.create_task(self.handle_request(writer, write_lock, pending, request_id, op, password, data, time.perf_counter()))
+                tasks.add(task)
+                task.add_done_callback(request_done)
+            if tasks:  # The client finished sending, deliver the remaining responses.
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # Anything still running can no longer be delivered, collect it so that no task outlives the connection with an unretrieved exception.
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self.stats.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+class crypto_error(Exception):
+    """Raised by crypto_client when the service reports an error"""
+
+class crypto_client:
+    """Pipelined asyncio client for crypto_service; any number of requests may be awaited concurrently over one connection"""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {}
+        self.receiver = asyncio.create_task(self.receive())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def receive(self):
+        error = ConnectionError("connection to nvgt crypto service closed")
+        try:
+            while True:
+                request_id, status, length = response_header.unpack(await self.reader.readexactly(response_header.size))
+                data = await self.reader.readexactly(length)
+                future = self.waiting.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == STATUS_OK:
+                    future.set_result(data)
+                else:
+                    future.set_exception(crypto_error(data.decode(errors="replace")))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            error = ConnectionError(f"connection to nvgt crypto service lost: {e}")
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.waiting.clear()
+
+    async def request(self, op, password="", data=b""):
+        if self.receiver.done():
+            raise ConnectionError("connection to nvgt crypto service closed")
+        request_id = self.next_id
+        self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+        password = password.encode()
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        try:
+            self.writer.write(request_header.pack(request_id, op, len(password), len(data)) + password + data)
+            await self.writer.drain()  # Backpressure from the service ends up here.
+        except BaseException:  # Including cancellation, the response would never be awaited.
+            self.waiting.pop(request_id, None)
+            raise
+        return await future
+
+    async def encrypt(self, data, password):
+        """Encrypt bytes or a string, returning the ciphertext bytes"""
+        if isinstance(data, str):
+            data = data.encode()
+        return await self.request(OP_ENCRYPT, password, data)
+
+    async def decrypt(self, data, password):
+        """Decrypt ciphertext bytes, returning the plaintext bytes"""
+        return await self.request(OP_DECRYPT, password, data)
+
+    async def stats(self):
+        return json.loads(await self.request(OP_STATS))
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await asyncio.gather(self.receiver, return_exceptions=True)
+
+async def run_load(args, host, port, unix_path):
+    """Drive a service with pipelined encrypt/decrypt requests and report latency and throughput"""
+    password = "nvgt load test"
+    payload = os.urandom(args.size)
+    clients = [await crypto_client.connect(host, port, unix_path) for i in range(args.connections)]
+    latencies = []
+    sent = 0
+
+    async def worker(client):
+        nonlocal sent
+        while sent < args.requests:
+            sent += 1
+            start = time.perf_counter()
+            ciphertext = await client.encrypt(payload, password)
+            latencies.append(time.perf_counter() - start)
+            if sent < args.requests:
+                sent += 1
+                start = time.perf_counter()
+                plaintext = await client.decrypt(ciphertext, password)
+                latencies.append(time.perf_counter() - start)
+                if plaintext != payload:
+                    raise crypto_error("round trip through the service did not return the original payload")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(c) for c in clients for i in range(args.depth)])
+    elapsed = time.perf_counter() - start
+    service_stats = await clients[0].stats()
+    for c in clients:
+        await c.close()
+    latencies.sort()
+    print(f"{len(latencies)} requests of {args.size} bytes over {args.connections} connections with {args.depth} in flight per connection")
+    print(f"elapsed: {elapsed:.3f}s")
+    print(f"requests per second: {len(latencies) / elapsed:.1f}")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:.3f}ms")
+    print(f"latency p99: {percentile(latencies, 99) * 1000:.3f}ms")
+    print(f"service counters: {json.dumps(service_stats)}")
+
+async def bench(args):
+    if args.unix or args.port:
+        await run_load(args, args.host, args.port, args.unix)
+        return
+    service = crypto_service(args.workers, args.max_pending)
+    with tempfile.TemporaryDirectory() as tmp:
+        if hasattr(asyncio, "start_unix_server"):
+            unix_path = os.path.join(tmp, "nvgt_crypto.sock")
+            await service.start(unix_path=unix_path)
+            host, port = None, None
+        else:
+            server = await service.start(port=0)
+            unix_path = None
+            host, port = server.sockets[0].getsockname()[:2]
+        try:
+            await run_load(args, host, port, unix_path)
+        finally:
+            await service.close()
+
+async def serve(args):
+    service = crypto_service(args.workers, args.max_pending)
+    server = await service.start(args.host, args.port or 8765, args.unix)
+    where = args.unix if args.unix else f"{args.host}:{args.port or 8765}"
+    print(f"nvgt crypto service listening on {where} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+        print(json.dumps(service.stats.snapshot()))
+
+def main():
+    parser = argparse.ArgumentParser(description="NVGT compatible encryption service")
+    parser.add_argument("mode", choices=["serve", "bench"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="TCP port, defaults to 8765 when serving")
+    parser.add_argument("--unix", help="listen on or connect to a UNIX socket at this path instead of TCP")
+    parser.add_argument("--workers", type=int, default=0, help="size of the AES worker pool")
+    parser.add_argument("--max-pending", type=int, default=256, help="maximum requests in flight per connection before the service stops reading from it")
+    parser.add_argument("--requests", type=int, default=20000, help="bench: total number of requests")
+    parser.add_argument("--connections", type=int, default=4, help="bench: number of connections")
+    parser.add_argument("--depth", type=int, default=16, help="bench: requests in flight per connection")
+    parser.add_argument("--size", type=int, default=256, help="bench: payload size in bytes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args) if args.mode == "serve" else bench(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
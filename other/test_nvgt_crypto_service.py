@@ -0,0 +1,60 @@
+# Tests for nvgt_crypto_service.py, run with python -m unittest from this directory.
+# NVGT - NonVisual Gaming Toolkit (https://nvgt.gg)
+# Copyright (c) 2022-2025 Sam Tupy
+# license: zlib
+
+import asyncio
+import unittest
+
+from nvgt_crypto_service import OP_ENCRYPT, crypto_client, crypto_service, request_header
+
+class fake_writer:
+    """Collects written bytes in place of an asyncio.StreamWriter, optionally failing on drain"""
+    def __init__(self, drain_error=None):
+        self.data = bytearray()
+        self.drain_error = drain_error
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        if self.drain_error:
+            raise self.drain_error
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+def make_request(request_id, password=b"pw", data=b"payload"):
+    return request_header.pack(request_id, OP_ENCRYPT, len(password), len(data)) + password + data
+
+class crypto_service_tests(unittest.IsolatedAsyncioTestCase):
+    async def test_truncated_pipelined_stream_resets_counters(self):
+        service = crypto_service(2, 256)
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"".join(make_request(i) for i in range(50)))
+        reader.feed_data(make_request(50)[:-3])  # Truncated body.
+        reader.feed_eof()
+        writer = fake_writer()
+        try:
+            await service.handle_connection(reader, writer)
+        finally:
+            await service.close()
+        self.assertEqual(service.stats.in_flight, 0)
+        self.assertEqual(service.stats.connections, 0)
+        self.assertTrue(writer.closed)
+
+    async def test_failed_drain_forgets_request(self):
+        reader = asyncio.StreamReader()
+        client = crypto_client(reader, fake_writer(ConnectionResetError()))
+        with self.assertRaises(ConnectionResetError):
+            await client.encrypt(b"data", "pw")
+        self.assertEqual(client.waiting, {})
+        reader.feed_eof()
+        await client.close()
+
+if __name__ == "__main__":
+    unittest.main()